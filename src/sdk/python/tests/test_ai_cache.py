@@ -0,0 +1,111 @@
+"""
+Checks of the AI result cache: copy-on-read, expiry, keying and batch errors.
+"""
+
+import pytest
+
+from financeanalyst_sdk import AIBatchError, AIResultCache, APIConfig, FinanceAnalystAPI
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return dict(self.body)
+
+
+def make_client(**overrides):
+    client = FinanceAnalystAPI(config=APIConfig(ai_cache_enabled=True, **overrides))
+    calls = []
+
+    def fake_request(method, endpoint, params=None, data=None, json_data=None, **kwargs):
+        calls.append(json_data)
+        return FakeResponse({'score': 0.5, 'tags': ['earnings']})
+
+    client._request = fake_request
+    return client, calls
+
+
+def test_cache_is_opt_in():
+    assert FinanceAnalystAPI().ai_cache is None
+
+
+def test_hits_are_independent_copies(tmp_path):
+    cache = AIResultCache(directory=str(tmp_path))
+    key = cache.key('/ai/sentiment', 'default', {'text': 'x'})
+    value = {'score': 1.0, 'tags': ['a']}
+    cache.set(key, value)
+    value['tags'].append('mutated')
+
+    first = cache.get(key)
+    first['tags'].append('mutated')
+    assert cache.get(key) == {'score': 1.0, 'tags': ['a']}
+
+    reloaded = AIResultCache(directory=str(tmp_path))
+    assert reloaded.get(key) == {'score': 1.0, 'tags': ['a']}
+
+
+def test_entries_expire(tmp_path, monkeypatch):
+    cache = AIResultCache(directory=str(tmp_path), ttl=10.0)
+    key = cache.key('/ai/insights', 'default', {'data': 1})
+    cache.set(key, {'summary': 'ok'})
+
+    import financeanalyst_sdk
+    now = financeanalyst_sdk.time.time()
+    monkeypatch.setattr(financeanalyst_sdk.time, 'time', lambda: now + 11.0)
+    assert cache.get(key) is None
+    assert cache.stats()['disk_entries'] == 0
+
+
+def test_batch_duplicates_do_not_alias():
+    client, calls = make_client()
+    results = client.analyze_sentiment_batch(['same', 'same', 'other'])
+    assert len(calls) == 2
+
+    results[0]['tags'].append('mutated')
+    assert results[1]['tags'] == ['earnings']
+    assert client.analyze_sentiment('same')['tags'] == ['earnings']
+    assert len(calls) == 2
+
+
+def test_model_version_is_part_of_key():
+    client, calls = make_client(ai_model_version='2024-01')
+    client.generate_insights({'revenue': 1})
+    client.generate_insights({'revenue': 1})
+    assert len(calls) == 1
+
+    client.config.ai_model_version = '2024-06'
+    client.generate_insights({'revenue': 1})
+    assert len(calls) == 2
+
+
+def test_distinct_floats_get_distinct_keys():
+    cache = AIResultCache()
+    key = cache.key('/ai/predict', 'default', {'data': {'price': 0.1 + 0.2}})
+
+    assert key != cache.key('/ai/predict', 'default', {'data': {'price': 0.3}})
+    assert key == cache.key('/ai/predict', 'default', {'data': {'price': 0.30000000000000004}})
+
+
+def test_batch_failures_raise_with_partial_results():
+    client, calls = make_client()
+
+    def flaky_request(method, endpoint, params=None, data=None, json_data=None, **kwargs):
+        calls.append(json_data)
+        if json_data['text'] == 'bad':
+            raise RuntimeError('upstream timeout')
+        return FakeResponse({'score': 0.5, 'tags': ['earnings']})
+
+    client._request = flaky_request
+    with pytest.raises(AIBatchError, match='1 of 3') as excinfo:
+        client.analyze_sentiment_batch(['good', 'bad', 'good'])
+
+    assert excinfo.value.results == [{'score': 0.5, 'tags': ['earnings']}, None,
+                                     {'score': 0.5, 'tags': ['earnings']}]
+    assert list(excinfo.value.errors) == [1]
+    assert str(excinfo.value.errors[1]) == 'upstream timeout'
+
+    # Successes were cached; the failure was not
+    assert client.analyze_sentiment('good') == {'score': 0.5, 'tags': ['earnings']}
+    assert len(calls) == 2
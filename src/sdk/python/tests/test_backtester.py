@@ -0,0 +1,151 @@
+"""
+Checks of the vectorized backtester against a straightforward per-date loop,
+plus parameter sweeps and performance metrics.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from financeanalyst_sdk import Backtester, performance_metrics
+
+SYMBOLS = ['AAA', 'BBB', 'CCC']
+
+
+def make_prices(seed=3, periods=160):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2023-01-02', periods=periods)
+    returns = rng.normal(0.0005, 0.015, size=(periods, len(SYMBOLS)))
+    return pd.DataFrame(100.0 * np.cumprod(1.0 + returns, axis=0), index=index, columns=SYMBOLS)
+
+
+def make_signals(prices, seed=4):
+    rng = np.random.default_rng(seed)
+    dates = list(prices.index[5::20])
+    # Decisions on a weekend roll to the next trading day; the second lands on
+    # a Monday that also has its own (later-dated) decision
+    fridays = prices.index[prices.index.dayofweek == 4]
+    dates.append(fridays[10] + pd.Timedelta(days=1))
+    dates.append(fridays[15] + pd.Timedelta(days=2))
+    dates.append(fridays[15] + pd.Timedelta(days=3))
+    weights = rng.uniform(0.0, 0.4, size=(len(dates), len(SYMBOLS)))
+    return pd.DataFrame(weights, index=pd.DatetimeIndex(dates), columns=SYMBOLS).sort_index()
+
+
+def loop_backtest(prices, signals, cost_bps, rebalance, lag):
+    """Reference: walk the dates one by one, holding weights as fractions of equity"""
+    returns = prices.pct_change().fillna(0.0).to_numpy()
+    index = prices.index
+    held = np.zeros(len(SYMBOLS))
+    rows = []
+    for t in range(len(index)):
+        target = None
+        if t >= lag:
+            decision_date = index[t - lag]
+            if rebalance == 'always':
+                known = signals.loc[:decision_date]
+                if len(known):
+                    target = known.iloc[-1].to_numpy()
+            else:
+                # Decisions made since the previous trading day, latest first
+                known = signals.loc[:decision_date]
+                if t > lag:
+                    known = known[known.index > index[t - lag - 1]]
+                elif len(known):
+                    known = known.iloc[[-1]]
+                if len(known):
+                    target = known.iloc[-1].to_numpy()
+
+        turnover = 0.0
+        if target is not None:
+            turnover = np.abs(target - held).sum()
+            held = target.copy()
+        gross = held @ returns[t]
+        cost = turnover * cost_bps / 10000.0
+        rows.append((gross - cost, gross, turnover, held.copy()))
+        held = held * (1.0 + returns[t]) / (1.0 + gross)
+
+    net, gross, turnover, weights = zip(*rows)
+    return np.array(net), np.array(gross), np.array(turnover), np.vstack(weights)
+
+
+@pytest.mark.parametrize('rebalance', ['signal', 'always'])
+@pytest.mark.parametrize('lag', [0, 1, 3])
+def test_matches_per_date_loop(rebalance, lag):
+    prices = make_prices()
+    signals = make_signals(prices)
+    result = Backtester(prices, transaction_cost_bps=15.0).run(signals, rebalance=rebalance, lag=lag)
+
+    net, gross, turnover, weights = loop_backtest(prices, signals, 15.0, rebalance, lag)
+    np.testing.assert_allclose(result.returns.to_numpy(), net, atol=1e-12)
+    np.testing.assert_allclose(result.gross_returns.to_numpy(), gross, atol=1e-12)
+    np.testing.assert_allclose(result.turnover.to_numpy(), turnover, atol=1e-12)
+    np.testing.assert_allclose(result.weights.to_numpy(), weights, atol=1e-12)
+    np.testing.assert_allclose(result.equity.to_numpy(), np.cumprod(1.0 + net), rtol=1e-12)
+
+
+def test_buy_and_hold_tracks_prices():
+    prices = make_prices()
+    signals = pd.DataFrame([[1.0, 0.0, 0.0]], index=prices.index[:1], columns=SYMBOLS)
+    result = Backtester(prices, transaction_cost_bps=0.0).run(signals, lag=0)
+
+    expected = prices['AAA'] / prices['AAA'].iloc[0]
+    np.testing.assert_allclose(result.equity.to_numpy(), expected.to_numpy(), rtol=1e-10)
+
+
+def test_weekend_signal_rebalances_on_monday():
+    prices = make_prices()
+    saturday = prices.index[prices.index.dayofweek == 4][3] + pd.Timedelta(days=1)
+    signals = pd.DataFrame([[0.5, 0.5, 0.0]], index=[saturday], columns=SYMBOLS)
+    result = Backtester(prices).run(signals, lag=0)
+
+    monday = saturday + pd.Timedelta(days=2)
+    assert result.turnover[result.turnover > 0].index.tolist() == [monday]
+    np.testing.assert_allclose(result.weights.loc[monday].to_numpy(), [0.5, 0.5, 0.0])
+
+
+def momentum(prices, lookback, top):
+    """Equal-weight the `top` symbols with the best trailing return, monthly"""
+    scores = prices.pct_change(lookback).iloc[lookback::21]
+    ranks = scores.rank(axis=1, ascending=False)
+    return (ranks <= top).astype(float) / top
+
+
+def test_sweep_matches_individual_runs():
+    backtester = Backtester(make_prices(periods=120), transaction_cost_bps=5.0)
+    grid = {'lookback': [10, 20], 'top': [1, 2]}
+
+    serial = backtester.sweep(momentum, grid, max_workers=1, lag=1)
+    pooled = backtester.sweep(momentum, grid, max_workers=2, lag=1)
+
+    assert serial[['lookback', 'top']].values.tolist() == [[10, 1], [10, 2], [20, 1], [20, 2]]
+    pd.testing.assert_frame_equal(serial, pooled)
+    expected = backtester.run(momentum(backtester.prices, lookback=20, top=2), lag=1).metrics
+    assert serial.iloc[3].drop(['lookback', 'top']).to_dict() == pytest.approx(expected)
+
+
+def test_performance_metrics_on_known_returns():
+    returns = pd.Series([0.10, -0.05, 0.02, np.nan, -0.01])
+    metrics = performance_metrics(returns, periods_per_year=4)
+
+    r = np.array([0.10, -0.05, 0.02, -0.01])
+    equity = np.cumprod(1 + r)
+    volatility = r.std(ddof=1) * 2.0
+    annualized = equity[-1] - 1.0
+    assert metrics['total_return'] == pytest.approx(equity[-1] - 1.0)
+    assert metrics['annualized_return'] == pytest.approx(annualized)
+    assert metrics['volatility'] == pytest.approx(volatility)
+    assert metrics['sharpe_ratio'] == pytest.approx(annualized / volatility)
+    assert metrics['sortino_ratio'] == pytest.approx(annualized / (np.sqrt((0.05 ** 2 + 0.01 ** 2) / 4) * 2.0))
+    assert metrics['max_drawdown'] == pytest.approx(1.0 - equity[1] / equity[0])
+    assert metrics['calmar_ratio'] == pytest.approx(annualized / (1.0 - equity[1] / equity[0]))
+    assert metrics['cvar_95'] == pytest.approx(0.05)
+    assert performance_metrics(pd.Series([np.nan])) == {}
+
+
+def test_performance_metrics_flat_series_has_zero_ratios():
+    metrics = performance_metrics(pd.Series([0.0] * 10))
+    assert metrics['volatility'] == 0.0
+    assert metrics['sharpe_ratio'] == 0.0
+    assert metrics['max_drawdown'] == 0.0
+    assert metrics['calmar_ratio'] == 0.0
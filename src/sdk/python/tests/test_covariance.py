@@ -0,0 +1,119 @@
+"""
+Covariance engine checks against pandas and reference shrinkage formulas.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from financeanalyst_sdk import CovarianceEngine
+
+
+def make_returns(seed=21, periods=300, columns=8, missing=0.15):
+    rng = np.random.default_rng(seed)
+    factor = rng.normal(0, 0.01, size=(periods, 1))
+    values = factor * rng.uniform(0.5, 1.5, size=(1, columns)) + rng.normal(0.0005, 0.01, size=(periods, columns))
+    df = pd.DataFrame(values, columns=[f'S{i}' for i in range(columns)])
+    if missing:
+        df = df.mask(rng.random(df.shape) < missing)
+        df.iloc[:250, -1] = np.nan  # a late listing with few co-observations
+    return df
+
+
+def sklearn_ledoit_wolf(X):
+    """Ledoit-Wolf intensity as in sklearn.covariance.ledoit_wolf_shrinkage"""
+    n, p = X.shape
+    X = X - X.mean(axis=0)
+    X2 = X ** 2
+    emp_cov_trace = X2.sum(axis=0) / n
+    mu = emp_cov_trace.sum() / p
+    beta_ = (X2.T @ X2).sum()
+    delta_ = ((X.T @ X) ** 2).sum() / n ** 2
+    beta = (beta_ / n - delta_) / (p * n)
+    delta = (delta_ - 2 * mu * emp_cov_trace.sum() + p * mu ** 2) / p
+    beta = min(beta, delta)
+    return 0.0 if beta == 0 else beta / delta
+
+
+def sklearn_oas(X):
+    """OAS intensity as in sklearn.covariance.oas"""
+    n, p = X.shape
+    X = X - X.mean(axis=0)
+    emp_cov = X.T @ X / n
+    mu = np.trace(emp_cov) / p
+    alpha = np.mean(emp_cov ** 2)
+    denominator = (n + 1) * (alpha - mu ** 2 / p)
+    return 1.0 if denominator == 0 else min((alpha + mu ** 2) / denominator, 1.0)
+
+
+@pytest.mark.parametrize('block_size', [3, 8, 64])
+def test_pairwise_complete_matches_pandas(block_size):
+    returns = make_returns()
+    engine = CovarianceEngine.from_returns(returns, block_size=block_size, min_periods=60)
+
+    pd.testing.assert_frame_equal(engine.covariance(as_frame=True), returns.cov(min_periods=60),
+                                  check_exact=False, rtol=1e-9, atol=1e-15)
+    pd.testing.assert_frame_equal(engine.correlation(as_frame=True), returns.corr(min_periods=60),
+                                  check_exact=False, rtol=1e-9, atol=1e-12)
+
+
+def test_incremental_updates_match_single_batch(tmp_path):
+    returns = make_returns()
+    engine = CovarianceEngine(list(returns.columns), block_size=3, directory=str(tmp_path))
+    engine.update(returns.iloc[:100]).update(returns.iloc[100:])
+
+    reopened = CovarianceEngine(list(returns.columns), block_size=5, directory=str(tmp_path))
+    assert reopened.rows == len(returns)
+    np.testing.assert_allclose(np.asarray(reopened.covariance()), returns.cov().to_numpy(),
+                               rtol=1e-9, atol=1e-15)
+
+
+@pytest.mark.parametrize('method, reference', [('ledoit_wolf', sklearn_ledoit_wolf), ('oas', sklearn_oas)])
+def test_shrinkage_intensity_matches_reference(method, reference):
+    returns = make_returns(periods=60, columns=30, missing=0.0)
+    engine = CovarianceEngine.from_returns(returns, block_size=7)
+    shrunk = engine.covariance(shrinkage=method)
+
+    expected = reference(returns.to_numpy())
+    assert 0.0 < expected < 1.0
+    assert engine.shrinkage == pytest.approx(expected, rel=1e-9)
+
+    sample = returns.cov().to_numpy()
+    target = np.eye(sample.shape[0]) * np.trace(sample) / sample.shape[0]
+    np.testing.assert_allclose(shrunk, (1 - expected) * sample + expected * target, rtol=1e-7, atol=1e-15)
+
+
+@pytest.mark.parametrize('method', ['ledoit_wolf', 'oas'])
+def test_batched_shrinkage_matches_single_fit(method, tmp_path):
+    # Batches with different means: the first batch's means are a poor centre
+    returns = make_returns(periods=90, columns=12, missing=0.0)
+    returns.iloc[30:] += 0.004
+    single = CovarianceEngine.from_returns(returns, block_size=5)
+    expected = single.covariance(shrinkage=method)
+
+    batched = CovarianceEngine(list(returns.columns), block_size=4, directory=str(tmp_path))
+    for start in range(0, 90, 30):
+        batched.update(returns.iloc[start:start + 30])
+    reopened = CovarianceEngine(list(returns.columns), block_size=4, directory=str(tmp_path))
+    shrunk = reopened.covariance(shrinkage=method)
+
+    assert reopened.shrinkage == pytest.approx(single.shrinkage, rel=1e-9)
+    if method == 'ledoit_wolf':
+        assert single.shrinkage == pytest.approx(sklearn_ledoit_wolf(returns.to_numpy()), rel=1e-9)
+    np.testing.assert_allclose(shrunk, expected, rtol=1e-9, atol=1e-15)
+
+
+def test_factor_model_recovers_low_rank_structure():
+    rng = np.random.default_rng(8)
+    loadings = rng.normal(0, 0.01, size=(40, 2))
+    returns = pd.DataFrame(rng.normal(size=(5000, 2)) @ loadings.T + rng.normal(0, 0.002, size=(5000, 40)))
+    engine = CovarianceEngine.from_returns(returns, block_size=16)
+    model = engine.factor_model(n_factors=2)
+
+    sample = engine.covariance()
+    np.testing.assert_allclose(model.covariance(block_size=7), sample, atol=2e-6)
+    weights = rng.dirichlet(np.ones(40), size=3).T
+    np.testing.assert_allclose(model.portfolio_variance(weights),
+                               np.einsum('ip,ij,jp->p', weights, model.covariance(), weights), rtol=1e-10)
+    assert model.portfolio_variance(weights[:, 0]) == pytest.approx(weights[:, 0] @ sample @ weights[:, 0],
+                                                                     rel=0.02)
@@ -0,0 +1,64 @@
+"""
+DataFrame memory policy checks: price frames shrink, statement figures keep
+their precision.
+"""
+
+import numpy as np
+import pandas as pd
+
+from financeanalyst_sdk import DataFramePolicy, optimize_dataframe
+
+
+def test_price_frames_shrink_within_tolerance():
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range('2020-01-01', periods=1000)
+    close = np.round(182.31 * np.cumprod(1 + rng.normal(0, 0.01, 1000)), 2)
+    df = pd.DataFrame({'open': close - 0.37, 'close': close,
+                       'return': np.r_[np.nan, close[1:] / close[:-1] - 1]}, index=index)
+    optimized = optimize_dataframe(df)
+
+    assert (optimized.dtypes == np.float32).all()
+    assert optimized.memory_usage(index=False).sum() == df.memory_usage(index=False).sum() // 2
+    np.testing.assert_allclose(optimized.to_numpy(np.float64), df.to_numpy(), rtol=1e-6)
+
+
+def test_columns_outside_float32_range_are_kept():
+    df = pd.DataFrame({'tiny': [1e-50, 2.0], 'huge': [1e40, 2.0], 'price': [182.31, 99.5]})
+    optimized = optimize_dataframe(df)
+
+    assert optimized['tiny'].dtype == np.float64
+    assert optimized['huge'].dtype == np.float64
+    assert optimized['price'].dtype == np.float32
+
+
+def test_statement_floats_downcast_only_when_exact():
+    df = pd.DataFrame({
+        'revenue': [391035000000.0, 383285000000.0 + 1.0, np.nan],
+        'price': [101.25, 99.5, np.nan],
+        'margin': [0.241, 0.253, 0.247],
+    })
+    optimized = optimize_dataframe(df, statement=True)
+
+    assert optimized['revenue'].dtype == np.float64
+    assert optimized['margin'].dtype == np.float64
+    assert optimized['price'].dtype == np.float32
+    pd.testing.assert_frame_equal(optimized.astype(np.float64), df)
+
+    exact = optimize_dataframe(df, DataFramePolicy(float_rtol=0.0))
+    assert exact['margin'].dtype == np.float64
+
+
+def test_sparse_statement_columns_keep_precision():
+    df = pd.DataFrame({'goodwill': [np.nan, np.nan, 1.23456789e10], 'shares': [np.nan, np.nan, 2.5]})
+    policy = DataFramePolicy(sparse_statements=True)
+    optimized = optimize_dataframe(df, policy, statement=True)
+
+    assert optimized['goodwill'].dtype == pd.SparseDtype(np.float64, np.nan)
+    assert optimized['shares'].dtype == pd.SparseDtype(np.float32, np.nan)
+    assert optimized['goodwill'].sparse.to_dense().iloc[2] == 1.23456789e10
+
+
+def test_integers_downcast_to_smallest_type():
+    optimized = optimize_dataframe(pd.DataFrame({'volume': [10, 200, 30000], 'delta': [-5, 0, 5]}))
+    assert optimized['volume'].dtype == np.uint16
+    assert optimized['delta'].dtype == np.int8
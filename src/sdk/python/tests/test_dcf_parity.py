@@ -0,0 +1,73 @@
+"""
+Parity tests between the SDK's local DCF engine and computeDCF in
+backend/routes/dcfScenarios.js (evaluated with node).
+"""
+
+import json
+import re
+import shutil
+import subprocess
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from financeanalyst_sdk import compute_dcf, dcf_monte_carlo, dcf_sensitivity
+
+BACKEND_ROUTE = Path(__file__).resolve().parents[4] / 'backend' / 'routes' / 'dcfScenarios.js'
+
+CASES = [
+    {},
+    {'currentRevenue': 250000000, 'revenueGrowthRate': 0.12, 'discountRate': 0.09},
+    {'projectionYears': 10, 'terminalGrowthRate': 0.025, 'netIncomeMargin': 0.22,
+     'capexAsPercentRevenue': 0.06, 'deprecationAsPercentRevenue': 0.04},
+    {'projectionYears': 3, 'revenueGrowthRate': -0.04, 'workingCapitalAsPercentRevenue': 0.12,
+     'sharesOutstanding': 2500000, 'cashAndEquivalents': 0, 'totalDebt': 900000000},
+]
+
+
+def backend_compute_dcf(cases):
+    source = BACKEND_ROUTE.read_text()
+    match = re.search(r'^function computeDCF\(assumptions\) \{.*?^\}', source, re.S | re.M)
+    assert match, 'computeDCF not found in backend route'
+    script = f"{match.group(0)}\nconsole.log(JSON.stringify({json.dumps(cases)}.map(computeDCF)));"
+    output = subprocess.run(['node', '-e', script], capture_output=True, text=True, check=True)
+    return json.loads(output.stdout)
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='node is required to run the backend implementation')
+def test_compute_dcf_matches_backend():
+    for case, expected in zip(CASES, backend_compute_dcf(CASES)):
+        actual = compute_dcf(case)
+        for key in ('terminalValue', 'terminalValuePV', 'sumPVCashFlows',
+                    'enterpriseValue', 'equityValue', 'valuePerShare'):
+            assert actual[key] == pytest.approx(expected[key], rel=1e-10)
+        assert len(actual['projectedCashFlows']) == len(expected['projectedCashFlows'])
+        for ours, theirs in zip(actual['projectedCashFlows'], expected['projectedCashFlows']):
+            assert ours['year'] == theirs['year']
+            for key in ('revenue', 'netIncome', 'freeCashFlow', 'presentValue'):
+                assert ours[key] == pytest.approx(theirs[key], rel=1e-10)
+
+
+def test_sensitivity_grid_matches_pointwise_valuation():
+    table = dcf_sensitivity(CASES[1], row_values=[0.08, 0.09, 0.10], column_values=[0.02, 0.03])
+    for rate in table.index:
+        for growth in table.columns:
+            expected = compute_dcf({**CASES[1], 'discountRate': rate, 'terminalGrowthRate': growth})
+            assert table.loc[rate, growth] == pytest.approx(expected['valuePerShare'], rel=1e-12)
+
+
+def test_sensitivity_masks_undefined_terminal_value():
+    table = dcf_sensitivity({}, row_values=[0.02, 0.10], column_values=[0.03])
+    assert np.isnan(table.loc[0.02, 0.03])
+    assert not np.isnan(table.loc[0.10, 0.03])
+
+
+def test_monte_carlo_draws_match_pointwise_valuation():
+    draws = dcf_monte_carlo(CASES[2], {'discountRate': ('uniform', 0.08, 0.12),
+                                       'projectionYears': np.array([5, 10, 7, 10])},
+                            n_draws=4, seed=7)
+    for _, draw in draws.iterrows():
+        expected = compute_dcf({**CASES[2], 'discountRate': draw['discountRate'],
+                                'projectionYears': int(draw['projectionYears'])})
+        assert draw['valuePerShare'] == pytest.approx(expected['valuePerShare'], rel=1e-12)
@@ -0,0 +1,137 @@
+"""
+Concurrency, hedging and rate limiting checks of provider federation with a stub transport.
+"""
+
+import json
+import threading
+import time
+
+import requests
+
+import financeanalyst_sdk as sdk
+from financeanalyst_sdk import APIConfig, FinanceAnalystAPI, ProviderConfig
+
+
+class StubTransport:
+    """Answers /integrations/<provider>/... after running a per-provider behaviour"""
+
+    offline = False
+
+    def __init__(self, behaviours=None):
+        self.behaviours = behaviours or {}
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def send(self, session, kwargs):
+        provider = kwargs['url'].split('/integrations/')[1].split('/')[0]
+        with self._lock:
+            count = self.calls.get(provider, 0)
+            self.calls[provider] = count + 1
+        behaviour = self.behaviours.get(provider)
+        if behaviour is not None:
+            behaviour(count)
+
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps({'price': 1.0, provider: count}).encode()
+        return response
+
+    def close(self):
+        pass
+
+
+class FakeTime:
+    """Stands in for the SDK's time module: the monotonic clock only moves when slept"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+        self._lock = threading.Lock()
+
+    def monotonic(self):
+        with self._lock:
+            return self.now
+
+    def sleep(self, seconds):
+        with self._lock:
+            self.sleeps.append(round(seconds, 6))
+            self.now += seconds
+
+    def time(self):
+        return time.time()
+
+
+def make_client(behaviours=None, **config):
+    return FinanceAnalystAPI(config=APIConfig(**config), transport=StubTransport(behaviours))
+
+
+def test_fan_out_runs_providers_in_parallel():
+    # Each call waits until all three are in flight, so a serial fan-out breaks the barrier
+    barrier = threading.Barrier(3, timeout=5)
+    api = make_client({name: lambda call: barrier.wait() for name in ('a', 'b', 'c')})
+    try:
+        result = api.get_federated_data(['a', 'b', 'c'], 'quote', strategy='merge', timeout=10)
+    finally:
+        api.federation.close()
+
+    assert not barrier.broken
+    assert result['sources']['a'] == 'a'
+    assert result['sources']['price'] == 'a'
+    assert {r['provider'] for r in result['provenance'] if r['status'] == 'ok'} == {'a', 'b', 'c'}
+
+
+def test_first_strategy_returns_fastest_answer():
+    release = threading.Event()
+    api = make_client({'slow': lambda call: release.wait(5)})
+    try:
+        result = api.get_federated_data(['slow', 'fast'], 'quote', strategy='first', timeout=10)
+    finally:
+        release.set()
+        api.federation.close()
+    assert result['provider'] == 'fast'
+
+
+def test_slow_primary_is_hedged():
+    # The primary is held until the test ends, so only the hedge can answer
+    release = threading.Event()
+    api = make_client({'vendor': lambda call: release.wait(5) if call == 0 else None})
+    api.federation.configure('vendor', ProviderConfig(hedge_min_samples=5))
+    channel = api.federation.channel('vendor')
+    for _ in range(5):
+        channel.record(0.02)
+
+    try:
+        result = api.get_federated_data(['vendor'], 'quote', timeout=10)
+    finally:
+        release.set()
+        api.federation.close()
+
+    assert result['data']['vendor'] == 1
+    attempts = {r['attempt']: r['status'] for r in result['provenance']}
+    assert attempts == {'primary': 'pending', 'hedge': 'ok'}
+
+
+def test_provider_limiter_spaces_requests(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(sdk, 'time', clock)
+    api = make_client()
+    api.federation.configure('vendor', ProviderConfig(requests_per_second=20.0, burst=1, hedge=False))
+    try:
+        for _ in range(4):
+            api.get_federated_data(['vendor'], 'quote', timeout=10)
+    finally:
+        api.federation.close()
+    assert clock.sleeps == [0.05, 0.05, 0.05]
+
+
+def test_provider_calls_also_respect_the_client_limit(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(sdk, 'time', clock)
+    api = make_client(max_requests_per_second=10.0, rate_limit_burst=1)
+    api.federation.configure('vendor', ProviderConfig(requests_per_second=1000.0, burst=100, hedge=False))
+    try:
+        for _ in range(3):
+            api.get_federated_data(['vendor'], 'quote', timeout=10)
+    finally:
+        api.federation.close()
+    assert clock.sleeps == [0.1, 0.1]
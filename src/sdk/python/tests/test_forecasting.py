@@ -0,0 +1,93 @@
+"""
+Local forecasting checks: model fits, common-sample AIC, short, empty and
+ragged series.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from financeanalyst_sdk import _fit_ar, _fit_holt, _fit_linear, forecast_series
+
+
+def make_series(seed=11, periods=60):
+    rng = np.random.default_rng(seed)
+    return {f's{i}': list(100 + np.cumsum(rng.normal(0.3, 1.0, periods))) for i in range(5)}
+
+
+def test_linear_matches_polyfit():
+    series = make_series()
+    result = forecast_series(series, horizon=4, model='linear')
+    for name, values in series.items():
+        slope, intercept = np.polyfit(np.arange(len(values)), values, 1)
+        expected = intercept + slope * np.arange(len(values), len(values) + 4)
+        np.testing.assert_allclose(result[name]['predictions'], expected, rtol=1e-9)
+
+
+def test_ar_matches_least_squares():
+    values = np.array(make_series()['s0'])
+    result = forecast_series({'x': values}, horizon=1, model='ar', ar_order=2)
+
+    X = np.column_stack([np.ones(len(values) - 2), values[1:-1], values[:-2]])
+    coef = np.linalg.lstsq(X, values[2:], rcond=None)[0]
+    expected = coef @ [1.0, values[-1], values[-2]]
+    np.testing.assert_allclose(result['x']['predictions'][0], expected, rtol=1e-6)
+
+
+def test_models_share_a_common_scoring_sample():
+    Y = np.array([make_series()['s1']])
+    fits = [_fit_linear(Y, 3, 1.96), _fit_holt(Y, 3, 1.96), _fit_ar(Y, 3, 1.96, order=3)]
+    residuals = np.stack([fit['residuals'] for fit in fits])
+
+    assert [np.isnan(r[0, :4]).sum() for r in residuals] == [0, 1, 3]
+    common = ~np.isnan(residuals).any(axis=0)
+    assert common.sum() == Y.shape[1] - 3
+
+
+def test_auto_prefers_trend_for_a_clean_line():
+    rng = np.random.default_rng(5)
+    line = 50 + 2.0 * np.arange(80) + rng.normal(0, 0.01, 80)
+    assert forecast_series({'line': line}, model='auto')['line']['model'] == 'linear'
+
+
+def test_short_series_have_nan_intervals():
+    result = forecast_series({'two': [1.0, 2.0], 'long': make_series()['s2']}, horizon=3)
+
+    assert result['two']['predictions'] == [3.0, 4.0, 5.0]
+    assert np.isnan(result['two']['confidence_intervals']['lower']).all()
+    assert np.isnan(result['two']['confidence_intervals']['upper']).all()
+    assert np.isfinite(result['long']['confidence_intervals']['lower']).all()
+
+
+@pytest.mark.parametrize('model', ['auto', 'linear', 'ets', 'ar'])
+def test_empty_series_get_nan_forecasts(model):
+    result = forecast_series({'empty': [], 'missing': [np.nan] * 4, 'long': make_series()['s3']},
+                             horizon=2, model=model)
+
+    for name in ('empty', 'missing'):
+        assert result[name]['model'] is None
+        assert np.isnan(result[name]['predictions']).all()
+        assert np.isnan(result[name]['confidence_intervals']['upper']).all()
+    assert np.isfinite(result['long']['predictions']).all()
+    assert forecast_series({'a': []}, horizon=2)['a']['model'] is None
+
+
+def test_ar_without_a_complete_lag_window_is_nan():
+    result = forecast_series({'one': [5.0]}, horizon=2, model='ar')
+    assert np.isnan(result['one']['predictions']).all()
+
+
+def test_frame_columns_stay_aligned_to_the_index():
+    index = pd.date_range('2024-01-31', periods=6, freq='ME')
+    frame = pd.DataFrame({'late_start': [np.nan, np.nan, 3.0, 4.0, 5.0, 6.0],
+                          'gap': [1.0, 2.0, np.nan, 4.0, 5.0, 6.0]}, index=index)
+    result = forecast_series(frame, horizon=2, model='linear')
+
+    assert result['late_start']['predictions'] == pytest.approx([7.0, 8.0])
+    assert result['gap']['predictions'] == pytest.approx([7.0, 8.0])
+
+
+def test_frame_columns_ending_early_are_rejected():
+    frame = pd.DataFrame({'full': [1.0, 2.0, 3.0], 'stale': [1.0, 2.0, np.nan]})
+    with pytest.raises(ValueError, match='stale'):
+        forecast_series(frame, horizon=2)
@@ -0,0 +1,163 @@
+"""
+Fundamentals checks: statement stacking, ratio math and request pacing.
+"""
+
+import math
+
+import pandas as pd
+import pytest
+
+import financeanalyst_sdk as sdk
+from financeanalyst_sdk import APIConfig, FinanceAnalystAPI, compute_financial_ratios
+
+
+STATEMENTS = {
+    'income': [
+        {'date': '2023', 'revenue': 1000.0, 'grossProfit': 400.0, 'operatingIncome': 250.0, 'netIncome': 200.0},
+        {'date': '2024', 'revenue': 1200.0, 'grossProfit': 540.0, 'operatingIncome': 300.0, 'netIncome': 240.0},
+    ],
+    'balance': [
+        {'date': '2023', 'totalAssets': 4000.0, 'totalStockholdersEquity': 2000.0, 'totalDebt': 500.0},
+        {'date': '2024', 'totalAssets': 4800.0, 'totalStockholdersEquity': 2400.0, 'totalDebt': 600.0},
+    ],
+    'cashflow': [
+        {'date': '2023', 'netIncome': 200.0, 'operatingCashFlow': 300.0, 'capitalExpenditure': -100.0},
+        {'date': '2024', 'netIncome': 240.0, 'operatingCashFlow': 350.0, 'capitalExpenditure': -110.0},
+    ],
+}
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+def make_client(statements=STATEMENTS, **config):
+    api = FinanceAnalystAPI(config=APIConfig(**config))
+
+    def fake_request(method, endpoint, params=None, **kwargs):
+        if endpoint.startswith('/company/BAD'):
+            raise RuntimeError('boom')
+        return FakeResponse({'data': statements[params['type']]})
+
+    api._request = fake_request
+    return api
+
+
+def test_stack_statement_melts_periods_and_drops_missing_values():
+    wide = pd.DataFrame([
+        {'fiscalYear': 2023, 'revenue': '1000', 'note': 'n/a'},
+        {'fiscalYear': 2024, 'revenue': 1200.0, 'note': None},
+    ])
+
+    long = sdk._stack_statement(wide, 'AAPL', 'income')
+
+    assert list(long.columns) == ['symbol', 'period', 'statement', 'line_item', 'value']
+    assert long[['period', 'line_item', 'value']].values.tolist() == [
+        ['2023', 'revenue', 1000.0],
+        ['2024', 'revenue', 1200.0],
+    ]
+    assert set(long['symbol']) == {'AAPL'}
+    assert set(long['statement']) == {'income'}
+
+
+def test_stack_statement_uses_a_labelled_index_as_the_period():
+    wide = pd.DataFrame({'revenue': [1.0, 2.0]}, index=pd.Index(['2023', '2024'], name='year'))
+
+    long = sdk._stack_statement(wide, 'AAPL', 'income')
+
+    assert long['period'].tolist() == ['2023', '2024']
+
+
+def test_stack_statement_rejects_statements_without_a_period():
+    with pytest.raises(ValueError, match='no period column'):
+        sdk._stack_statement(pd.DataFrame({'revenue': [1.0, 2.0]}), 'AAPL', 'income')
+
+
+def test_load_fundamentals_keeps_items_reported_on_several_statements():
+    api = make_client()
+
+    fundamentals = api.load_fundamentals(['AAPL', 'BAD'])
+
+    assert fundamentals.index.names == ['symbol', 'period', 'statement', 'line_item']
+    assert fundamentals.index.is_unique
+    assert fundamentals.loc[('AAPL', '2024', 'income', 'netIncome'), 'value'] == 240.0
+    assert fundamentals.loc[('AAPL', '2024', 'cashflow', 'netIncome'), 'value'] == 240.0
+    assert set(fundamentals.attrs['errors']) == {('BAD', 'income'), ('BAD', 'balance'), ('BAD', 'cashflow')}
+
+
+def test_load_fundamentals_reports_statements_without_a_period():
+    undated = {name: [{k: v for k, v in row.items() if k != 'date'} for row in rows]
+               for name, rows in STATEMENTS.items()}
+    api = make_client(undated)
+
+    fundamentals = api.load_fundamentals(['AAPL'], statement_types=('income',))
+
+    assert fundamentals.empty
+    assert 'no period column' in fundamentals.attrs['errors'][('AAPL', 'income')]
+
+
+def test_financial_ratios():
+    fundamentals = make_client().load_fundamentals(['AAPL'])
+
+    ratios = compute_financial_ratios(fundamentals, market_caps={'AAPL': 10000.0})
+    row = ratios.loc[('AAPL', '2024')]
+
+    assert row['gross_margin'] == pytest.approx(0.45)
+    assert row['operating_margin'] == pytest.approx(0.25)
+    assert row['net_margin'] == pytest.approx(0.2)
+    assert row['roe'] == pytest.approx(0.1)
+    assert row['roa'] == pytest.approx(0.05)
+    assert row['debt_to_equity'] == pytest.approx(0.25)
+    assert row['debt_to_assets'] == pytest.approx(0.125)
+    assert row['free_cash_flow'] == pytest.approx(240.0)
+    assert row['fcf_yield'] == pytest.approx(0.024)
+    assert list(ratios.index) == [('AAPL', '2023'), ('AAPL', '2024')]
+
+
+def test_ratios_with_zero_denominators_are_nan():
+    fundamentals = make_client({
+        'income': [{'date': '2024', 'revenue': 0.0, 'netIncome': 10.0}],
+    }).load_fundamentals(['AAPL'], statement_types=('income',))
+
+    ratios = compute_financial_ratios(fundamentals, market_caps={'AAPL': 0.0})
+
+    assert math.isnan(ratios.loc[('AAPL', '2024'), 'net_margin'])
+    assert math.isnan(ratios.loc[('AAPL', '2024'), 'roe'])
+    assert math.isnan(ratios.loc[('AAPL', '2024'), 'fcf_yield'])
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_spaces_requests_after_the_burst(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(sdk.time, 'monotonic', clock)
+    bucket = sdk._TokenBucket(rate=4.0, burst=2)
+
+    delays = [bucket.reserve() for _ in range(4)]
+    assert delays == pytest.approx([0.0, 0.0, 0.25, 0.5])
+
+    clock.now += 1.0
+    assert bucket.reserve() == pytest.approx(0.0)
+
+
+def test_zero_rate_disables_limiting(monkeypatch):
+    monkeypatch.setattr(sdk.time, 'monotonic', FakeClock())
+    bucket = sdk._TokenBucket(rate=0, burst=1)
+
+    assert [bucket.reserve() for _ in range(5)] == [0.0] * 5
+    assert FinanceAnalystAPI(config=APIConfig(max_requests_per_second=0))._foreground_load() == 0.0
+
+
+def test_negative_rate_is_rejected():
+    with pytest.raises(ValueError, match='non-negative'):
+        sdk._TokenBucket(rate=-1.0, burst=1)
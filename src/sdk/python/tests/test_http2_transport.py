@@ -0,0 +1,53 @@
+"""
+HTTP2Transport checks against a local server (skipped without httpx).
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip('httpx')
+
+from financeanalyst_sdk import APIConfig, FinanceAnalystAPI, ProviderConfig  # noqa: E402
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = json.dumps({'path': self.path, 'api_key': self.headers.get('X-API-Key')}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), EchoHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_port}/v1'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_provider_sessions_get_their_own_pools(server):
+    api = FinanceAnalystAPI('key-1', config=APIConfig(base_url=server, http2=True))
+    api.federation.configure('vendor', ProviderConfig(pool_size=3))
+    try:
+        assert api.get_api_status() == {'path': '/v1/health', 'api_key': 'key-1'}
+        result = api.get_federated_data(['vendor'], 'quote', timeout=5)
+        assert result['data'] == {'path': '/v1/integrations/vendor/quote', 'api_key': 'key-1'}
+
+        transport = api.transport
+        assert transport.stats()['pools'] == 2
+        vendor_pool = transport._clients[api.federation.channel('vendor').session]
+        assert vendor_pool is not transport._clients[api.session]
+    finally:
+        api.federation.close()
+        api.transport.close()
@@ -0,0 +1,140 @@
+"""
+JobManager checks against an in-memory job server transport.
+"""
+
+import hashlib
+import hmac
+import json
+import threading
+import time
+
+import pytest
+import requests
+
+from financeanalyst_sdk import APIConfig, FinanceAnalystAPI
+
+
+def make_response(status, body=b'', headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body if isinstance(body, bytes) else json.dumps(body).encode()
+    response.headers.update(headers or {})
+    return response
+
+
+class JobServer:
+    """Answers the job endpoints; jobs complete after `polls` status checks"""
+
+    offline = True
+
+    def __init__(self, polls=2, result=None, inline=True, total_header=True):
+        self.polls = polls
+        self.result = result if result is not None else {'value': 42}
+        self.inline = inline
+        self.total_header = total_header
+        self.status_calls = {}
+        self.cancelled = []
+        self._lock = threading.Lock()
+        self._next = 0
+
+    def send(self, session, kwargs):
+        method = kwargs['method']
+        path = kwargs['url'].split('/v1', 1)[1]
+        with self._lock:
+            if method == 'POST' and path == '/jobs':
+                self._next += 1
+                return make_response(202, {'job_id': f'job-{self._next}'})
+            if method == 'POST' and path == '/webhooks/register':
+                return make_response(200, {'webhook_id': 'wh-1'})
+            job_id = path.split('/')[2]
+            if method == 'DELETE':
+                self.cancelled.append(job_id)
+                return make_response(204)
+            if path.endswith('/result'):
+                return self._range(kwargs['headers']['Range'])
+            count = self.status_calls[job_id] = self.status_calls.get(job_id, 0) + 1
+        if count < self.polls:
+            return make_response(200, {'status': 'running', 'progress': count / self.polls})
+        if self.inline:
+            return make_response(200, {'status': 'completed', 'result': self.result})
+        return make_response(200, {'status': 'completed'})
+
+    def _range(self, header):
+        body = json.dumps(self.result).encode()
+        start, end = (int(x) for x in header.split('=')[1].split('-'))
+        part = body[start:end + 1]
+        total = str(len(body)) if self.total_header else '*'
+        return make_response(206, part, {'Content-Range': f'bytes {start}-{start + len(part) - 1}/{total}'})
+
+    def close(self):
+        pass
+
+
+def make_client(server, **config):
+    config = {'job_poll_min_interval': 0.01, 'job_poll_max_interval': 0.05, **config}
+    return FinanceAnalystAPI(config=APIConfig(**config), transport=server)
+
+
+def test_jobs_resolve_in_submission_order():
+    server = JobServer(polls=3)
+    api = make_client(server)
+    handles = [api.submit_job('/analytics/dcf', {'n': i}) for i in range(3)]
+
+    assert api.jobs.gather(handles, timeout=5) == [{'value': 42}] * 3
+    assert all(server.status_calls[h.job_id] == 3 for h in handles)
+    assert api.jobs.pending() == 0
+
+
+@pytest.mark.parametrize('total_header', [True, False])
+def test_result_is_downloaded_in_chunks(total_header):
+    result = {'rows': list(range(200))}
+    server = JobServer(polls=1, result=result, inline=False, total_header=total_header)
+    api = make_client(server, job_download_chunk_bytes=64)
+
+    assert api.submit_job('/analytics/montecarlo', {}).result(timeout=5) == result
+
+
+def test_result_of_exact_chunk_multiple_with_unknown_length():
+    result = 'x' * 62  # serializes to 64 bytes
+    server = JobServer(polls=1, result=result, inline=False, total_header=False)
+    api = make_client(server, job_download_chunk_bytes=32)
+
+    assert api.submit_job('/analytics/montecarlo', {}).result(timeout=5) == result
+
+
+def test_cancel_stops_polling_and_cancels_on_server():
+    server = JobServer(polls=10 ** 6)
+    api = make_client(server)
+    handle = api.submit_job('/analytics/dcf', {})
+
+    assert handle.cancel()
+    assert handle.cancelled()
+    assert server.cancelled == [handle.job_id]
+    assert api.jobs.pending() == 0
+
+
+def test_signed_webhook_triggers_immediate_poll():
+    server = JobServer(polls=1)
+    api = make_client(server, job_poll_min_interval=60.0, job_poll_max_interval=60.0)
+    api.jobs.enable_webhook('https://example.com/hook', secret='s3cret')
+    handle = api.submit_job('/analytics/dcf', {})
+
+    # Signed the way webhookService.generateSignature does it:
+    # 'sha256=' + hex HMAC of JSON.stringify(payload), which is also the posted body
+    payload = {'event': 'job.completed', 'data': {'job_id': handle.job_id, 'note': 'café'}}
+    body = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    signature = 'sha256=' + hmac.new(b's3cret', body, hashlib.sha256).hexdigest()
+
+    with pytest.raises(ValueError):
+        api.jobs.handle_webhook(body, signature='forged')
+    with pytest.raises(ValueError):
+        api.jobs.handle_webhook(body, signature='sha256=' + '0' * 64)
+    with pytest.raises(ValueError):
+        api.jobs.handle_webhook(payload)
+    assert api.jobs.verify_signature(payload, signature, 's3cret')
+    assert not api.jobs.verify_signature(body, signature, 'other')
+
+    started = time.time()
+    api.jobs.handle_webhook(body, signature=signature)
+    assert handle.result(timeout=5) == {'value': 42}
+    assert time.time() - started < 5
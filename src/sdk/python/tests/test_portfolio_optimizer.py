@@ -0,0 +1,97 @@
+"""
+Checks of the local portfolio optimizer against closed-form solutions.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from financeanalyst_sdk import OptimizationConstraints, PortfolioOptimizer
+
+SYMBOLS = ['AAA', 'BBB', 'CCC', 'DDD', 'EEE']
+
+
+def make_returns(seed=7, periods=750):
+    rng = np.random.default_rng(seed)
+    factor = rng.normal(0.0004, 0.01, size=(periods, 1))
+    loadings = np.array([[0.6, 0.9, 1.1, 1.4, 0.3]])
+    noise = rng.normal(0.0002, 0.008, size=(periods, len(SYMBOLS))) * np.array([1.0, 1.3, 0.8, 1.6, 0.7])
+    drift = np.array([0.0004, 0.0006, 0.0005, 0.0008, 0.0003])
+    return pd.DataFrame(factor @ loadings + noise + drift, columns=SYMBOLS)
+
+
+UNCONSTRAINED = OptimizationConstraints(min_weight=-10.0, max_weight=10.0)
+
+
+def test_min_variance_matches_closed_form():
+    optimizer = PortfolioOptimizer(make_returns(), constraints=UNCONSTRAINED)
+    result = optimizer.min_variance(max_iter=20000, tol=1e-12)
+
+    inverse = np.linalg.inv(optimizer.cov)
+    expected = inverse.sum(axis=1) / inverse.sum()
+    np.testing.assert_allclose(result.weights.to_numpy(), expected, atol=1e-6)
+
+
+@pytest.mark.parametrize('risk_aversion', [2.0, 10.0, 50.0])
+def test_mean_variance_matches_closed_form(risk_aversion):
+    optimizer = PortfolioOptimizer(make_returns(), constraints=UNCONSTRAINED)
+    result = optimizer.mean_variance(risk_aversion, max_iter=20000, tol=1e-12)
+
+    # w = C^-1 (mu - nu 1) / gamma with nu set by the budget constraint
+    inverse = np.linalg.inv(optimizer.cov)
+    ones = np.ones(len(SYMBOLS))
+    nu = (ones @ inverse @ optimizer.mu - risk_aversion) / (ones @ inverse @ ones)
+    expected = inverse @ (optimizer.mu - nu * ones) / risk_aversion
+    np.testing.assert_allclose(result.weights.to_numpy(), expected, atol=1e-6)
+
+
+def test_max_sharpe_reaches_tangency_sharpe_ratio():
+    optimizer = PortfolioOptimizer(make_returns(), constraints=UNCONSTRAINED, risk_free_rate=0.01)
+    result = optimizer.max_sharpe(n_points=25, refinements=3, max_iter=5000, tol=1e-10)
+
+    excess = optimizer.mu - optimizer.risk_free_rate
+    tangency = np.linalg.solve(optimizer.cov, excess)
+    tangency /= tangency.sum()
+    best = (tangency @ optimizer.mu - optimizer.risk_free_rate) / np.sqrt(tangency @ optimizer.cov @ tangency)
+    assert result.sharpe_ratio == pytest.approx(best, rel=1e-4)
+
+
+def test_parallel_frontier_matches_serial():
+    optimizer = PortfolioOptimizer(make_returns())
+    serial = optimizer.efficient_frontier(n_points=8)
+    optimizer = PortfolioOptimizer(make_returns())
+    parallel = optimizer.efficient_frontier(n_points=8, max_workers=2)
+    pd.testing.assert_frame_equal(serial, parallel, atol=1e-10)
+
+    weights = serial[SYMBOLS].to_numpy()
+    np.testing.assert_allclose(weights.sum(axis=1), 1.0, atol=1e-9)
+    assert (weights >= -1e-12).all()
+
+
+def test_risk_parity_equalizes_risk_contributions():
+    optimizer = PortfolioOptimizer(make_returns())
+    weights = optimizer.risk_parity().weights.to_numpy()
+
+    contributions = weights * (optimizer.cov @ weights)
+    np.testing.assert_allclose(contributions / contributions.sum(), 1 / len(SYMBOLS), atol=1e-8)
+
+
+def test_turnover_constraint_binds_exactly():
+    previous = dict(zip(SYMBOLS, [0.2] * 5))
+    constraints = OptimizationConstraints(max_weight=0.6, max_turnover=0.1, previous_weights=previous)
+    result = PortfolioOptimizer(make_returns(), constraints=constraints).max_sharpe()
+
+    turnover = np.abs(result.weights.to_numpy() - 0.2).sum()
+    assert turnover == pytest.approx(0.1, abs=1e-6)
+    assert result.weights.sum() == pytest.approx(1.0)
+
+
+def test_rebalance_does_not_mutate_caller_constraints():
+    constraints = OptimizationConstraints(max_weight=0.6)
+    returns = make_returns()
+    optimizer = PortfolioOptimizer(returns.iloc[:500], constraints=constraints)
+    first = optimizer.min_variance()
+    optimizer.rebalance(returns.iloc[250:], objective='min_variance')
+
+    assert constraints.previous_weights is None
+    assert optimizer.constraints.previous_weights == pytest.approx(first.weights.to_dict())
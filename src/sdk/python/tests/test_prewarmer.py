@@ -0,0 +1,110 @@
+"""
+Cache pre-warming checks: warmed hits, copy safety, scoping and backoff.
+"""
+
+import threading
+import time
+
+from financeanalyst_sdk import APIConfig, FinanceAnalystAPI, Watchlist
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+def make_client(**config):
+    config = {'quote_ttl': 0.5, 'prewarm_max_rate': 200.0, **config}
+    api = FinanceAnalystAPI(config=APIConfig(**config))
+    calls = []
+    lock = threading.Lock()
+
+    def fake_request(method, endpoint, params=None, **kwargs):
+        with lock:
+            calls.append((endpoint, threading.current_thread().name))
+        return FakeResponse({'endpoint': endpoint, 'tags': ['live']})
+
+    api._request = fake_request
+    return api, calls
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def foreground(calls):
+    return [endpoint for endpoint, thread in calls if thread != 'cache-prewarmer']
+
+
+def test_warmed_quotes_are_served_from_cache_as_copies():
+    api, calls = make_client()
+    api.add_watchlist(Watchlist('core', symbols=['AAPL', 'MSFT']))
+    try:
+        wait_for(lambda: api.prewarmer.stats()['refreshed'] >= 2)
+        quote = api.get_stock_quote('AAPL')
+        quote['tags'].append('mutated')
+        assert api.get_stock_quote('AAPL') == {'endpoint': '/market/quote/AAPL', 'tags': ['live']}
+        assert foreground(calls) == []
+    finally:
+        api.prewarmer.stop(timeout=5)
+
+
+def test_entries_are_refreshed_before_expiry():
+    api, calls = make_client(quote_ttl=0.2)
+    api.add_watchlist(Watchlist('core', symbols=['AAPL']))
+    try:
+        wait_for(lambda: api.prewarmer.stats()['refreshed'] >= 4)
+        for _ in range(5):
+            api.get_stock_quote('AAPL')
+            time.sleep(0.05)
+        assert foreground(calls) == []
+    finally:
+        api.prewarmer.stop(timeout=5)
+
+
+def test_only_watchlist_endpoints_are_cached():
+    api, calls = make_client()
+    api.add_watchlist(Watchlist('core', symbols=['AAPL']))
+    try:
+        wait_for(lambda: api.prewarmer.stats()['refreshed'] >= 1)
+        api.get_stock_quote('TSLA')
+        api.get_stock_quote('TSLA')
+        api.get_company_info('AAPL')
+        api.get_company_info('AAPL')
+        assert foreground(calls) == ['/market/quote/TSLA'] * 2 + ['/company/AAPL/info'] * 2
+    finally:
+        api.prewarmer.stop(timeout=5)
+
+    api.prewarmer.remove('core')
+    api.get_stock_quote('AAPL')
+    assert foreground(calls)[-1] == '/market/quote/AAPL'
+
+
+def test_refreshes_back_off_under_foreground_load():
+    api, calls = make_client(max_requests_per_second=10.0, prewarm_backoff_load=0.5)
+    now = time.time()
+    api._foreground_requests.extend([now] * 8)
+    api.add_watchlist(Watchlist('core', symbols=['AAPL']))
+    try:
+        wait_for(lambda: api.prewarmer.stats()['deferred'] >= 1)
+        assert api.prewarmer.stats()['refreshed'] == 0
+        wait_for(lambda: api.prewarmer.stats()['refreshed'] >= 1)
+    finally:
+        api.prewarmer.stop(timeout=5)
+
+
+def test_inactive_schedule_is_not_refreshed():
+    api, calls = make_client()
+    closed = [day for day in range(7) if day != time.gmtime().tm_wday]
+    api.add_watchlist(Watchlist('weekend', symbols=['AAPL'], weekdays=tuple(closed)))
+    try:
+        time.sleep(0.2)
+        assert calls == []
+    finally:
+        api.prewarmer.stop(timeout=5)
@@ -0,0 +1,154 @@
+"""
+Record/replay transport checks: round trips, strict misses, lenient fallback,
+ranged requests and credential redaction.
+"""
+
+import json
+import sqlite3
+import zlib
+
+import pytest
+import requests
+
+from financeanalyst_sdk import (APIConfig, FinanceAnalystAPI, RecordingTransport,
+                                ReplayMissError, ReplayTransport)
+
+
+def fake_network(calls):
+    def request(method, url, params=None, **kwargs):
+        calls.append((method, url, params))
+        response = requests.Response()
+        response.status_code = 200
+        response.headers['Content-Type'] = 'application/json'
+        response._content = json.dumps({'url': url, 'params': params or {},
+                                        'body': kwargs.get('json')}).encode()
+        return response
+    return request
+
+
+def record(path, ignore_params=()):
+    calls = []
+    api = FinanceAnalystAPI(config=APIConfig(), transport=RecordingTransport(path, ignore_params))
+    api.session.request = fake_network(calls)
+    api.get_stock_quote('AAPL')
+    api._request('GET', '/market/history/AAPL', params={'period': '1y', 'nonce': 'a'})
+    api._request('POST', '/ai/sentiment', json_data={'text': 'beat estimates'})
+    api.transport.close()
+    return calls
+
+
+def replay_client(path, mode='strict', ignore_params=()):
+    return FinanceAnalystAPI(config=APIConfig(base_url='http://replay.invalid/v1'),
+                             transport=ReplayTransport(path, mode=mode, ignore_params=ignore_params))
+
+
+def test_replay_reproduces_recorded_responses(tmp_path):
+    path = str(tmp_path / 'archive.db')
+    assert len(record(path)) == 3
+
+    api = replay_client(path)
+    api.session.request = lambda *a, **k: pytest.fail('replay must not touch the network')
+
+    quote = api.get_stock_quote('AAPL')
+    assert quote['url'].endswith('/market/quote/AAPL')
+    history = api._request('GET', '/market/history/AAPL', params={'period': '1y', 'nonce': 'a'}).json()
+    assert history['params'] == {'period': '1y', 'nonce': 'a'}
+    sentiment = api._request('POST', '/ai/sentiment', json_data={'text': 'beat estimates'}).json()
+    assert sentiment['body'] == {'text': 'beat estimates'}
+    assert api.transport.hits == 3
+
+
+def test_strict_mode_raises_on_unrecorded_request(tmp_path):
+    path = str(tmp_path / 'archive.db')
+    record(path)
+    api = replay_client(path)
+
+    with pytest.raises(ReplayMissError):
+        api._request('GET', '/market/history/AAPL', params={'period': '5y', 'nonce': 'a'})
+    with pytest.raises(ReplayMissError):
+        api._request('POST', '/ai/sentiment', json_data={'text': 'missed estimates'})
+    with pytest.raises(ReplayMissError):
+        api.get_stock_quote('MSFT')
+    assert api.transport.misses == 3
+
+
+def test_lenient_mode_falls_back_to_same_path(tmp_path):
+    path = str(tmp_path / 'archive.db')
+    record(path)
+    api = replay_client(path, mode='lenient')
+
+    history = api._request('GET', '/market/history/AAPL', params={'period': '5y'}).json()
+    assert history['params'] == {'period': '1y', 'nonce': 'a'}
+    with pytest.raises(ReplayMissError):
+        api.get_stock_quote('MSFT')
+
+
+def test_ignored_params_match_strictly(tmp_path):
+    path = str(tmp_path / 'archive.db')
+    record(path, ignore_params=('nonce',))
+    api = replay_client(path, ignore_params=('nonce',))
+
+    history = api._request('GET', '/market/history/AAPL', params={'period': '1y', 'nonce': 'b'}).json()
+    assert history['params']['nonce'] == 'a'
+
+
+def test_missing_archive_and_unknown_mode(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ReplayTransport(str(tmp_path / 'missing.db'))
+    path = str(tmp_path / 'archive.db')
+    record(path)
+    with pytest.raises(ValueError):
+        ReplayTransport(path, mode='fuzzy')
+
+
+def test_ranged_requests_are_recorded_separately(tmp_path):
+    path = str(tmp_path / 'archive.db')
+    api = FinanceAnalystAPI(config=APIConfig(), transport=RecordingTransport(path))
+
+    def ranged(method, url, params=None, headers=None, **kwargs):
+        response = requests.Response()
+        response.status_code = 206
+        response._content = (headers or {}).get('Range', '').encode()
+        return response
+
+    api.session.request = ranged
+    for offset in (0, 100):
+        api._request('GET', '/jobs/j1/result', headers={'Range': f'bytes={offset}-{offset + 99}'})
+    api.transport.close()
+
+    api = replay_client(path)
+    for offset in (100, 0):
+        chunk = api._request('GET', '/jobs/j1/result', headers={'Range': f'bytes={offset}-{offset + 99}'})
+        assert chunk.content == f'bytes={offset}-{offset + 99}'.encode()
+    with pytest.raises(ReplayMissError):
+        api._request('GET', '/jobs/j1/result', headers={'Range': 'bytes=200-299'})
+
+
+def test_auth_tokens_are_not_stored_in_plaintext(tmp_path):
+    path = str(tmp_path / 'archive.db')
+    api = FinanceAnalystAPI(config=APIConfig(client_id='id', client_secret='shh'),
+                            transport=RecordingTransport(path))
+
+    def issue_token(method, url, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps({'access_token': 'live-access', 'refresh_token': 'live-refresh',
+                                        'token_type': 'Bearer', 'expires_in': 3600}).encode()
+        return response
+
+    api.session.request = issue_token
+    api.authenticate('user', 'hunter2')
+    api.transport.close()
+
+    with sqlite3.connect(path) as db:
+        rows = db.execute('SELECT strict_key, body FROM responses').fetchall()
+    stored = b''.join(key.encode() + zlib.decompress(body) for key, body in rows)
+    assert b'[REDACTED]' in stored
+    for secret in (b'live-access', b'live-refresh', b'hunter2', b'shh'):
+        assert secret not in stored
+
+    api = FinanceAnalystAPI(config=APIConfig(client_id='id', client_secret='shh'),
+                            transport=ReplayTransport(path))
+    tokens = api.authenticate('user', 'hunter2')
+    assert tokens.access_token == '[REDACTED]'
+    assert tokens.token_type == 'Bearer'
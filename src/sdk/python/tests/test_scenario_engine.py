@@ -0,0 +1,139 @@
+"""
+Scenario ladder checks against brute-force per-instrument pricing.
+"""
+
+from math import erf, exp, floor, log, sqrt
+
+import numpy as np
+import pytest
+
+from financeanalyst_sdk import ScenarioEngine
+
+SPOT_SHOCKS = [-0.2, -0.05, 0.0, 0.1]
+VOL_SHOCKS = [-0.05, 0.0, 0.1]
+RATE_SHOCKS = [-0.01, 0.0, 0.02]
+
+
+def make_book(seed=13, size=40):
+    rng = np.random.default_rng(seed)
+    book = []
+    for i in range(size):
+        spot = float(rng.uniform(50, 150))
+        underlying = ['SPX', 'NDX', 'CL'][i % 3]
+        kind = i % 5
+        if kind in (0, 1):
+            book.append({'type': 'call' if kind == 0 else 'put', 'underlyingAsset': underlying,
+                         'spotPrice': spot, 'strikePrice': round(spot * rng.uniform(0.8, 1.2), 1),
+                         'timeToExpiry': float(rng.uniform(0.1, 2.0)), 'volatility': float(rng.uniform(0.1, 0.5)),
+                         'riskFreeRate': 0.03, 'dividendYield': 0.01, 'quantity': float(rng.integers(-5, 6))})
+        elif kind == 2:
+            book.append({'type': 'option', 'optionType': 'put', 'underlyingAsset': underlying,
+                         'spotPrice': spot, 'strikePrice': round(spot, 0), 'timeToExpiry': 0.5,
+                         'volatility': 0.25, 'riskFreeRate': 0.03, 'contractSize': 100})
+        elif kind == 3:
+            book.append({'type': 'forward' if i % 2 else 'futures', 'underlyingAsset': underlying,
+                         'spotPrice': spot, 'strikePrice': round(spot * 1.02, 1),
+                         'timeToDelivery': float(rng.uniform(0.1, 1.5)), 'riskFreeRate': 0.03,
+                         'storageCosts': 0.01, 'convenienceYield': 0.005, 'contractSize': 10, 'quantity': 2})
+        else:
+            book.append({'type': 'swap', 'underlyingAsset': underlying, 'notionalPrincipal': 1e6,
+                         'fixedRate': 0.035, 'paymentFrequency': [1, 2, 4][i % 3],
+                         'timeToMaturity': float(rng.uniform(1, 10)), 'riskFreeRate': 0.03, 'spread': 0.001})
+    # Duplicate positions are merged by the engine but must still count twice
+    return book + book[:5]
+
+
+def cdf(x):
+    return 0.5 * (1 + erf(x / sqrt(2)))
+
+
+def price(d, spot_shock, vol_shock, rate_shock):
+    """Value of one position at one grid point, priced from scratch"""
+    rate = d.get('riskFreeRate', 0.0) + rate_shock
+    kind = d['type']
+    if kind == 'swap':
+        step = 1 / d['paymentFrequency']
+        payments = floor(d['timeToMaturity'] * d['paymentFrequency'])
+        annuity = sum(step * exp(-rate * step * i) for i in range(1, payments + 1))
+        return d['notionalPrincipal'] * (rate + d['spread'] - d['fixedRate']) * annuity
+
+    spot = d['spotPrice'] * (1 + spot_shock)
+    size = d.get('quantity', 1.0) * d.get('contractSize', 1.0)
+    if kind in ('forward', 'futures'):
+        carry = d['storageCosts'] - d['convenienceYield'] - d.get('dividendYield', 0.0)
+        T = d['timeToDelivery']
+        discount = exp(-rate * T) if kind == 'forward' else 1.0
+        return size * discount * (spot * exp((rate + carry) * T) - d['strikePrice'])
+
+    is_call = (d.get('optionType', kind)) == 'call'
+    vol, T, K, q = max(d['volatility'] + vol_shock, 0.0), d['timeToExpiry'], d['strikePrice'], d.get('dividendYield', 0.0)
+    if vol == 0:
+        forward = spot * exp((rate - q) * T)
+        intrinsic = max(forward - K, 0.0) if is_call else max(K - forward, 0.0)
+        return size * exp(-rate * T) * intrinsic
+    d1 = (log(spot / K) + (rate - q + vol ** 2 / 2) * T) / (vol * sqrt(T))
+    d2 = d1 - vol * sqrt(T)
+    if is_call:
+        value = spot * exp(-q * T) * cdf(d1) - K * exp(-rate * T) * cdf(d2)
+    else:
+        value = K * exp(-rate * T) * cdf(-d2) - spot * exp(-q * T) * cdf(-d1)
+    return size * value
+
+
+def brute_force(book, group_by):
+    groups = list(dict.fromkeys(d[group_by] for d in book))
+    cube = np.zeros((len(groups), len(SPOT_SHOCKS), len(VOL_SHOCKS), len(RATE_SHOCKS)))
+    for d in book:
+        g = groups.index(d[group_by])
+        base = price(d, 0.0, 0.0, 0.0)
+        for i, s in enumerate(SPOT_SHOCKS):
+            for j, v in enumerate(VOL_SHOCKS):
+                for k, r in enumerate(RATE_SHOCKS):
+                    cube[g, i, j, k] += price(d, s, v, r) - base
+    return groups, cube
+
+
+@pytest.mark.parametrize('group_by', ['type', 'underlyingAsset'])
+def test_ladder_matches_brute_force(group_by):
+    book = make_book()
+    engine = ScenarioEngine(book, group_by=group_by, shard_size=7, block_elements=50)
+    cube = engine.run(SPOT_SHOCKS, VOL_SHOCKS, RATE_SHOCKS)
+
+    groups, expected = brute_force(book, group_by)
+    assert cube.groups == groups
+    assert engine.instruments == len(book) - 5
+    np.testing.assert_allclose(cube.values, expected, rtol=1e-9, atol=1e-6)
+    assert cube.sel(spot_shock=0.0, vol_shock=0.0, rate_shock=0.0) == pytest.approx(0.0, abs=1e-6)
+
+
+def test_process_pool_matches_in_process():
+    book = make_book(seed=5, size=60)
+    serial = ScenarioEngine(book, shard_size=8).run(SPOT_SHOCKS, VOL_SHOCKS, RATE_SHOCKS)
+    parallel = ScenarioEngine(book, shard_size=8).run(SPOT_SHOCKS, VOL_SHOCKS, RATE_SHOCKS, max_workers=2)
+
+    np.testing.assert_allclose(parallel.values, serial.values, rtol=1e-12, atol=1e-9)
+    assert parallel.base_values == pytest.approx(serial.base_values)
+
+
+def test_unsupported_instruments_are_rejected():
+    with pytest.raises(ValueError, match='Unsupported'):
+        ScenarioEngine([{'type': 'swaption'}])
+    with pytest.raises(ValueError, match='interest_rate'):
+        ScenarioEngine([{'type': 'swap', 'swapType': 'currency'}])
+
+
+def test_invalid_books_are_rejected():
+    with pytest.raises(ValueError, match="needs a 'type'"):
+        ScenarioEngine([{'spotPrice': 100.0}])
+    with pytest.raises(ValueError, match='paymentFrequency'):
+        ScenarioEngine([{'type': 'swap', 'notionalPrincipal': 1e6, 'paymentFrequency': 0,
+                         'timeToMaturity': 5.0, 'fixedRate': 0.03}])
+
+
+def test_empty_book_gives_an_empty_cube():
+    engine = ScenarioEngine([])
+    cube = engine.run(SPOT_SHOCKS, VOL_SHOCKS, RATE_SHOCKS)
+
+    assert engine.positions == 0 and engine.groups == []
+    assert cube.values.shape == (0, len(SPOT_SHOCKS), len(VOL_SHOCKS), len(RATE_SHOCKS))
+    assert not cube.total().any()
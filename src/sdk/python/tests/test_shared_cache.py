@@ -0,0 +1,109 @@
+"""
+SharedCache checks: cross-process refresh leases, stale serving, tenant keys
+and concurrent writers.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+from financeanalyst_sdk import APIConfig, FinanceAnalystAPI, SharedCache
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+def _slow_loader(counter_path):
+    with open(counter_path, 'a') as f:
+        f.write(f"{os.getpid()}\n")
+    time.sleep(0.3)
+    return {'price': 101.5}
+
+
+def _refresh_in_child(cache_path, counter_path, start, results):
+    cache = SharedCache(cache_path)
+    start.wait()
+    results.put(cache.get_or_refresh('quote:AAPL', lambda: _slow_loader(counter_path), ttl=60))
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+def test_only_one_process_refreshes(tmp_path):
+    cache_path, counter_path = str(tmp_path / 'cache.db'), str(tmp_path / 'loads')
+    SharedCache(cache_path)
+    context = multiprocessing.get_context('fork')
+    start, results = context.Event(), context.Queue()
+    workers = [context.Process(target=_refresh_in_child, args=(cache_path, counter_path, start, results))
+               for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    start.set()
+    values = [results.get(timeout=30) for _ in workers]
+    for worker in workers:
+        worker.join(timeout=30)
+
+    assert values == [{'price': 101.5}] * 4
+    with open(counter_path) as f:
+        assert len(f.read().split()) == 1
+
+
+def test_stale_value_served_while_another_owner_refreshes(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    refresher, reader = SharedCache(path), SharedCache(path)
+    refresher.set('quote:AAPL', {'price': 100.0}, ttl=-1)
+    assert reader.get('quote:AAPL') is None
+
+    assert refresher._acquire('quote:AAPL')
+    value = reader.get_or_refresh('quote:AAPL', lambda: pytest.fail('lease is held elsewhere'), ttl=60)
+    assert value == {'price': 100.0}
+
+    refresher._release('quote:AAPL')
+    assert reader.get_or_refresh('quote:AAPL', lambda: {'price': 102.0}, ttl=60) == {'price': 102.0}
+    assert refresher.get('quote:AAPL') == {'price': 102.0}
+
+
+def test_abandoned_lease_is_taken_over(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    crashed, reader = SharedCache(path, lease_timeout=0.05), SharedCache(path, lease_timeout=0.05)
+    assert crashed._acquire('quote:AAPL')
+    time.sleep(0.1)
+    assert reader.get_or_refresh('quote:AAPL', lambda: {'price': 99.0}, ttl=60) == {'price': 99.0}
+
+
+def test_clients_with_different_credentials_do_not_share_entries(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    clients = {}
+    for api_key in ('tenant-a', 'tenant-b'):
+        api = FinanceAnalystAPI(api_key, config=APIConfig(shared_cache_path=path))
+        api._request = lambda method, endpoint, key=api_key, **kwargs: FakeResponse({'owner': key})
+        clients[api_key] = api
+
+    assert clients['tenant-a'].get_stock_quote('AAPL') == {'owner': 'tenant-a'}
+    assert clients['tenant-b'].get_stock_quote('AAPL') == {'owner': 'tenant-b'}
+    assert clients['tenant-a'].get_stock_quote('AAPL') == {'owner': 'tenant-a'}
+
+
+def test_concurrent_writers_purge_expired_entries(tmp_path):
+    cache = SharedCache(str(tmp_path / 'cache.db'))
+    assert cache._connection().execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+
+    def write(worker):
+        for i in range(250):
+            cache.set(f'{worker}:{i}', i, ttl=-1)
+
+    threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Exactly 1000 writes counted, so the periodic purge ran and removed them all
+    assert cache._writes == 1000
+    assert cache._connection().execute('SELECT COUNT(*) FROM entries').fetchone()[0] == 0
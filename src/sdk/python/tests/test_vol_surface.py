@@ -0,0 +1,144 @@
+"""
+Implied volatility and SVI surface checks on synthetic quotes.
+"""
+
+from math import erf, erfc, exp, log, sqrt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from financeanalyst_sdk import (SVISlice, VolSurface, _fit_svi, _norm_cdf, black_scholes_price,
+                                implied_volatility)
+
+
+def closed_form(spot, strike, expiry, vol, rate, dividend_yield, is_call):
+    cdf = lambda x: 0.5 * (1 + erf(x / sqrt(2)))  # noqa: E731
+    d1 = (log(spot / strike) + (rate - dividend_yield + vol ** 2 / 2) * expiry) / (vol * sqrt(expiry))
+    d2 = d1 - vol * sqrt(expiry)
+    if is_call:
+        return spot * exp(-dividend_yield * expiry) * cdf(d1) - strike * exp(-rate * expiry) * cdf(d2)
+    return strike * exp(-rate * expiry) * cdf(-d2) - spot * exp(-dividend_yield * expiry) * cdf(-d1)
+
+
+def svi(k, a, b, rho, m, sigma):
+    return a + b * (rho * (k - m) + np.sqrt((k - m) ** 2 + sigma ** 2))
+
+
+def test_norm_cdf_matches_erfc_into_the_tails():
+    x = np.concatenate([np.linspace(-37.0, 37.0, 2961), [-3.0001, -3.0, -2.9999]])
+    expected = np.array([erfc(-v / sqrt(2)) / 2 for v in x])
+    np.testing.assert_allclose(_norm_cdf(x), expected, rtol=1e-12, atol=0)
+
+    # The lower tail keeps its relative accuracy down to ~1e-300
+    z = np.linspace(0.0, 37.0, 1851)
+    np.testing.assert_allclose(_norm_cdf(-z), [erfc(v / sqrt(2)) / 2 for v in z], rtol=1e-12, atol=0)
+
+    assert _norm_cdf(np.zeros((2, 3))).shape == (2, 3)
+    assert float(_norm_cdf(0.5)) == pytest.approx(0.5 * (1 + erf(0.5 / sqrt(2))), rel=1e-14)
+    assert _norm_cdf(-40.0) == 0.0 and _norm_cdf(40.0) == 1.0
+
+
+@pytest.mark.parametrize('is_call', [True, False])
+def test_black_scholes_matches_closed_form(is_call):
+    for strike, expiry, vol in [(80, 0.25, 0.2), (100, 1.0, 0.35), (130, 2.5, 0.6)]:
+        expected = closed_form(100.0, strike, expiry, vol, 0.03, 0.01, is_call)
+        assert float(black_scholes_price(100.0, strike, expiry, vol, 0.03, 0.01, is_call)) == \
+            pytest.approx(expected, rel=1e-10)
+
+
+def test_implied_volatility_round_trip():
+    strike, expiry, vol = np.meshgrid(np.linspace(60, 150, 19), [0.05, 0.5, 1.0, 3.0], [0.08, 0.25, 0.6, 1.2])
+    strike, expiry, vol = strike.ravel(), expiry.ravel(), vol.ravel()
+    is_call = np.arange(strike.size) % 2 == 0
+    price = black_scholes_price(100.0, strike, expiry, vol, 0.02, 0.01, is_call)
+
+    solved = implied_volatility(price, 100.0, strike, expiry, 0.02, 0.01, is_call)
+    # Volatility is only identifiable where the price carries time value
+    forward = 100.0 * np.exp(0.01 * expiry)
+    intrinsic = np.exp(-0.02 * expiry) * np.maximum(np.where(is_call, forward - strike, strike - forward), 0.0)
+    identifiable = price - intrinsic > 1e-6
+    assert identifiable.mean() > 0.8
+    np.testing.assert_allclose(solved[identifiable], vol[identifiable], atol=1e-7)
+
+
+def test_prices_outside_bounds_give_nan():
+    solved = implied_volatility([0.0, 150.0, -1.0], 100.0, [100.0, 100.0, 100.0], 1.0, is_call=True)
+    assert np.isnan(solved).all()
+
+
+@pytest.mark.parametrize('params', [
+    (0.02, 0.4, -0.4, 0.05, 0.2),
+    (0.5, 1.3, 0.2, -0.1, 0.4),  # steep wings: b above 1 but within Lee's bound
+])
+def test_svi_recovers_synthetic_smile(params):
+    k = np.linspace(-0.8, 0.8, 41)
+    a, b, rho, m, sigma, rmse = _fit_svi(k, svi(k, *params))
+
+    assert rmse < 1e-4
+    np.testing.assert_allclose(svi(k, a, b, rho, m, sigma), svi(k, *params), atol=2e-4)
+    assert b == pytest.approx(params[1], rel=0.05)
+
+
+def test_svi_fit_excludes_butterfly_arbitrage():
+    # A smile with butterfly arbitrage (g < 0 near the money)
+    params = (0.01, 1.5, 0.2, -0.1, 0.1)
+    k = np.linspace(-0.8, 0.8, 41)
+    grid = np.linspace(-1.5, 1.5, 301)
+    assert SVISlice(1.0, 100.0, *params, rmse=0.0, n_points=0).durrleman(grid).min() < 0
+
+    constrained = SVISlice(1.0, 100.0, *_fit_svi(k, svi(k, *params)), n_points=k.size)
+    assert constrained.durrleman(grid).min() >= 0
+
+    a, b, rho, m, sigma, rmse = _fit_svi(k, svi(k, *params), butterfly_free=False)
+    assert rmse < 1e-4
+    assert b == pytest.approx(params[1], rel=0.05)
+
+
+def test_svi_fit_respects_wing_bound():
+    rng = np.random.default_rng(2)
+    k = np.linspace(-1.0, 1.0, 30)
+    noisy = svi(k, 0.0, 2.5, 0.1, 0.0, 0.05) + rng.normal(0, 0.01, k.size)
+    _, b, rho, _, _, _ = _fit_svi(k, noisy)
+    assert b * (1 + abs(rho)) <= 2 + 1e-9
+
+
+def make_chain(spot=100.0, rate=0.01, smiles=((0.25, (0.005, 0.1, -0.5, 0.0, 0.1)),
+                                              (1.0, (0.02, 0.15, -0.4, 0.02, 0.2)))):
+    rows = []
+    for expiry, (a, b, rho, m, sigma) in smiles:
+        forward = spot * np.exp(rate * expiry)
+        for strike in np.linspace(70, 140, 29):
+            vol = np.sqrt(svi(np.log(strike / forward), a, b, rho, m, sigma) / expiry)
+            for kind in ('call', 'put'):
+                price = float(black_scholes_price(spot, strike, expiry, vol, rate, 0.0, kind == 'call'))
+                rows.append({'type': kind, 'strikePrice': strike, 'timeToExpiry': expiry,
+                             'price': price, 'trueVol': vol})
+    return pd.DataFrame(rows)
+
+
+def test_surface_reprices_chain():
+    chain = make_chain()
+    surface = VolSurface.from_chain(chain, 100.0, rate=0.01)
+
+    assert len(surface.slices) == 2
+    np.testing.assert_allclose(surface.points['impliedVolatility'], chain['trueVol'], atol=1e-7)
+    np.testing.assert_allclose(surface.vol(chain['strikePrice'], chain['timeToExpiry']),
+                               chain['trueVol'], atol=2e-3)
+    assert surface.arbitrage['arbitrage_free']
+
+
+def test_chain_without_usable_quotes_raises():
+    chain = make_chain().assign(price=0.0)
+    with pytest.raises(ValueError, match='No usable quotes'):
+        VolSurface.from_chain(chain, 100.0, rate=0.01)
+
+
+def test_surface_fits_are_butterfly_free_unless_disabled():
+    chain = make_chain(smiles=((1.0, (0.01, 0.6, 0.2, -0.1, 0.05)),))
+    assert SVISlice(1.0, 100.0, 0.01, 0.6, 0.2, -0.1, 0.05, 0.0, 0).durrleman(np.linspace(-1.5, 1.5, 101)).min() < 0
+
+    assert VolSurface.from_chain(chain, 100.0, rate=0.01).arbitrage['butterfly'] == []
+    unconstrained = VolSurface.from_chain(chain, 100.0, rate=0.01, butterfly_free=False)
+    assert len(unconstrained.arbitrage['butterfly']) == 1
+    assert not unconstrained.arbitrage['arbitrage_free']